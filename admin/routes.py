@@ -1,14 +1,18 @@
 # admin/routes.py
 import os
-import json
-from datetime import datetime
+import math
+import hashlib
+from datetime import datetime, timedelta
 from flask import (
     Blueprint, render_template, request, redirect, url_for, 
-    flash, session, jsonify, current_app
+    flash, session, jsonify, current_app, abort, g
 )
-from models import db, Application, User, Document, Admin
+from sqlalchemy import tuple_, update
+from sqlalchemy.orm import selectinload
+from models import db, cache, Application, User, Document, Admin
 from services import decision_service, notification_service
 from functools import wraps
+from werkzeug.exceptions import HTTPException
 
 # Create admin blueprint
 admin_bp = Blueprint('admin', __name__, url_prefix='/admin')
@@ -17,161 +21,228 @@ admin_bp = Blueprint('admin', __name__, url_prefix='/admin')
 def admin_required(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        if 'admin_id' not in session:
+        admin_id = session.get('admin_id')
+        if admin_id is None:
             flash('Please log in as admin to access this page.', 'error')
             return redirect(url_for('login'))
+        # Views read the logged-in admin from g
+        g.admin_id = admin_id
         return f(*args, **kwargs)
     return decorated_function
 
+# Single error handler for all admin views
+@admin_bp.errorhandler(Exception)
+def handle_admin_error(e):
+    """Roll back, log and fail gracefully on unexpected errors in admin views"""
+    if isinstance(e, HTTPException):
+        return e
+    
+    db.session.rollback()
+    current_app.logger.exception(f"Error in {request.endpoint} ({request.path}): {str(e)}")
+    
+    if request.endpoint and request.endpoint.startswith('admin.api_'):
+        return jsonify({'error': str(e)}), 500
+    
+    # Redirecting the dashboard to itself would loop, so render it empty
+    if request.endpoint == 'admin.dashboard':
+        flash('Error loading dashboard.', 'error')
+        return render_template('admin/dashboard.html', stats={}, applications=[])
+    
+    flash(f'Error processing request: {str(e)}', 'error')
+    return redirect(url_for('admin.dashboard'))
+
 # Helper function for EMI calculation (same as in app.py)
 def calculate_emi(principal, annual_rate, tenure_months):
     """Calculate EMI using the standard formula"""
-    try:
-        monthly_rate = annual_rate / 12 / 100
-        if monthly_rate == 0:  # Handle zero interest rate
-            return principal / tenure_months
-        
-        emi = principal * monthly_rate * (1 + monthly_rate) ** tenure_months / ((1 + monthly_rate) ** tenure_months - 1)
-        return round(emi, 2)
-    except Exception as e:
-        current_app.logger.error(f"Error calculating EMI: {e}")
-        return 0
+    monthly_rate = annual_rate / 12 / 100
+    if monthly_rate == 0:  # Handle zero interest rate
+        return principal / tenure_months
+    
+    # (1 + r)^n - 1 computed once, without cancellation for small rates
+    growth = math.expm1(tenure_months * math.log1p(monthly_rate))
+    emi = principal * monthly_rate * (1.0 + 1.0 / growth)
+    return round(emi, 2)
+
+@cache.memoize(timeout=60)
+def get_status_counts():
+    """Return application counts per status using a single GROUP BY query"""
+    rows = db.session.query(
+        Application.status, db.func.count(Application.id)
+    ).group_by(Application.status).all()
+    return dict(rows)
+
+@cache.memoize(timeout=60)
+def get_application_stats():
+    """Return total, last-week and per-status counts in a single query"""
+    # Weekly application counts
+    one_week_ago = datetime.utcnow() - timedelta(days=7)
+    
+    # Single pass over the table using conditional aggregates
+    count = db.func.count
+    row = db.session.query(
+        count(Application.id).label('total'),
+        count(Application.id).filter(Application.created_at >= one_week_ago).label('last_week'),
+        count(Application.id).filter(Application.status == 'APPROVED').label('approved'),
+        count(Application.id).filter(Application.status == 'PENDING').label('pending'),
+        count(Application.id).filter(Application.status == 'REJECTED').label('rejected')
+    ).one()
+    
+    return {
+        'total': row.total,
+        'last_week': row.last_week,
+        'approved': row.approved,
+        'pending': row.pending,
+        'rejected': row.rejected
+    }
+
+def invalidate_stats_cache():
+    """Drop cached counts after an application status change"""
+    cache.delete_memoized(get_status_counts)
+    cache.delete_memoized(get_application_stats)
 
 @admin_bp.route('/dashboard')
 @admin_required
 def dashboard():
     """Admin dashboard showing application statistics"""
-    try:
-        # Get application statistics
-        total_applications = Application.query.count()
-        approved_count = Application.query.filter_by(status='APPROVED').count()
-        rejected_count = Application.query.filter_by(status='REJECTED').count()
-        pending_count = Application.query.filter_by(status='PENDING').count()
-        
-        stats = {
-            'total_applications': total_applications,
-            'approved_count': approved_count,
-            'rejected_count': rejected_count,
-            'pending_count': pending_count
-        }
-        
-        # Get recent applications (last 20)
-        recent_apps = Application.query.order_by(Application.created_at.desc()).limit(20).all()
-        
-        return render_template('admin/dashboard.html', 
-                             stats=stats, 
-                             applications=recent_apps)
+    # Get application statistics
+    counts = get_status_counts()
     
-    except Exception as e:
-        current_app.logger.error(f"Error loading admin dashboard: {str(e)}")
-        flash('Error loading dashboard.', 'error')
-        return render_template('admin/dashboard.html', stats={}, applications=[])
+    stats = {
+        'total_applications': sum(counts.values()),
+        'approved_count': counts.get('APPROVED', 0),
+        'rejected_count': counts.get('REJECTED', 0),
+        'pending_count': counts.get('PENDING', 0)
+    }
+    
+    # Get recent applications (last 20)
+    recent_apps = Application.query.options(
+        selectinload(Application.user),
+        selectinload(Application.reviewed_by_admin)
+    ).order_by(Application.created_at.desc()).limit(20).all()
+    
+    return render_template('admin/dashboard.html', 
+                         stats=stats, 
+                         applications=recent_apps)
 
 @admin_bp.route('/application/<app_id>/review', methods=['GET', 'POST'])
 @admin_required
 def review_application(app_id):
     """Admin review and decision making for applications"""
-    try:
-        application = Application.query.filter_by(id=app_id).first_or_404()
+    # Primary-key lookup goes through the session identity map first
+    application = db.session.get(Application, app_id)
+    if application is None:
+        abort(404)
+    
+    if request.method == 'POST':
+        new_status = request.form.get('status')
+        admin_notes = request.form.get('admin_notes')
+        interest_rate = request.form.get('interest_rate')
+        loan_term_years = request.form.get('loan_term_years')
+        
+        # Update application status
+        application.status = new_status
+        application.admin_review_notes = admin_notes
         
-        if request.method == 'POST':
-            new_status = request.form.get('status')
-            admin_notes = request.form.get('admin_notes')
-            interest_rate = request.form.get('interest_rate')
-            loan_term_years = request.form.get('loan_term_years')
-            
-            # Update application status
-            application.status = new_status
-            application.admin_review_notes = admin_notes
-            
-            if new_status == 'APPROVED' and interest_rate and loan_term_years:
-                application.interest_rate = float(interest_rate)
-                application.loan_term_years = int(loan_term_years)
-                application.emi_amount = calculate_emi(
-                    application.loan_amount, 
-                    application.interest_rate, 
-                    application.loan_term_years * 12
-                )
-            
-            application.reviewed_by_admin_id = session['admin_id']
-            application.reviewed_at = datetime.utcnow()
-            
-            db.session.commit()
-            
-            # Send notification to user
-            notification_service.send_decision_notification(
-                application, 
-                f"Application reviewed by admin. Status: {new_status}. Notes: {admin_notes}"
+        if new_status == 'APPROVED' and interest_rate and loan_term_years:
+            application.interest_rate = float(interest_rate)
+            application.loan_term_years = int(loan_term_years)
+            application.emi_amount = calculate_emi(
+                application.loan_amount, 
+                application.interest_rate, 
+                application.loan_term_years * 12
             )
-            
-            flash(f'Application #{application.id} status updated to {new_status}', 'success')
-            return redirect(url_for('admin.dashboard'))
         
-        # GET request - load all reports for the review
-        banking_report = json.loads(application.banking_analysis_report or '{}')
-        fraud_report = json.loads(application.fraud_detection_report or '{}')
-        credit_report = json.loads(application.ai_analysis_report or '{}') if application.ai_analysis_report else {}
-        employment_report = json.loads(application.employment_verification_report or '{}')
-        document_report = json.loads(application.document_verification_report or '{}')
-        na_report = json.loads(application.na_document_verification or '{}')
-        verification_summary = json.loads(application.verification_summary or '{}')
+        application.reviewed_by_admin_id = g.admin_id
+        application.reviewed_at = datetime.utcnow()
         
-        return render_template('admin/application_review.html',
-                             application=application,
-                             banking_report=banking_report,
-                             fraud_report=fraud_report,
-                             credit_report=credit_report,
-                             employment_report=employment_report,
-                             document_report=document_report,
-                             na_report=na_report,
-                             verification_summary=verification_summary)
-    
-    except Exception as e:
-        db.session.rollback()
-        current_app.logger.error(f"Error in admin review for application {app_id}: {str(e)}")
-        flash(f'Error reviewing application: {str(e)}', 'error')
+        # Send notification to user once the review is committed
+        notification_service.notify_after_commit(
+            application.id, 
+            f"Application reviewed by admin. Status: {new_status}. Notes: {admin_notes}"
+        )
+        
+        db.session.commit()
+        invalidate_stats_cache()
+        
+        flash(f'Application #{application.id} status updated to {new_status}', 'success')
         return redirect(url_for('admin.dashboard'))
+    
+    # GET request - reports are JSON columns and load as dicts
+    banking_report = application.banking_analysis_report or {}
+    fraud_report = application.fraud_detection_report or {}
+    credit_report = application.ai_analysis_report or {}
+    employment_report = application.employment_verification_report or {}
+    document_report = application.document_verification_report or {}
+    na_report = application.na_verification_report()
+    verification_summary = application.verification_summary or {}
+    
+    return render_template('admin/application_review.html',
+                         application=application,
+                         banking_report=banking_report,
+                         fraud_report=fraud_report,
+                         credit_report=credit_report,
+                         employment_report=employment_report,
+                         document_report=document_report,
+                         na_report=na_report,
+                         verification_summary=verification_summary)
 
 @admin_bp.route('/applications')
 @admin_required
 def applications():
     """View all applications with filtering options"""
-    try:
-        status_filter = request.args.get('status', 'all')
-        page = request.args.get('page', 1, type=int)
-        per_page = 20
-        
-        # Build query based on filters
-        if status_filter == 'all':
-            applications_query = Application.query
-        else:
-            applications_query = Application.query.filter_by(status=status_filter.upper())
-        
-        # Paginate results
-        applications_paginated = applications_query.order_by(
-            Application.created_at.desc()
-        ).paginate(page=page, per_page=per_page, error_out=False)
-        
-        # Get counts for each status
-        status_counts = {
-            'all': Application.query.count(),
-            'pending': Application.query.filter_by(status='PENDING').count(),
-            'approved': Application.query.filter_by(status='APPROVED').count(),
-            'rejected': Application.query.filter_by(status='REJECTED').count()
+    status_filter = request.args.get('status', 'all')
+    after_created_at = request.args.get('after_created_at')
+    after_id = request.args.get('after_id')
+    per_page = 20
+    
+    # Build query based on filters
+    if status_filter == 'all':
+        applications_query = Application.query
+    else:
+        applications_query = Application.query.filter_by(status=status_filter.upper())
+    
+    # Keyset pagination: seek past the last row of the previous page
+    if after_created_at and after_id:
+        after_ts = datetime.fromisoformat(after_created_at)
+        applications_query = applications_query.filter(
+            tuple_(Application.created_at, Application.id) < tuple_(after_ts, after_id)
+        )
+    
+    # Fetch one extra row to know whether a next page exists,
+    # loading related rows in one IN query each
+    rows = applications_query.options(
+        selectinload(Application.user),
+        selectinload(Application.reviewed_by_admin)
+    ).order_by(
+        Application.created_at.desc(),
+        Application.id.desc()
+    ).limit(per_page + 1).all()
+    
+    has_next = len(rows) > per_page
+    applications_page = rows[:per_page]
+    next_cursor = None
+    if has_next:
+        last_app = applications_page[-1]
+        next_cursor = {
+            'after_created_at': last_app.created_at.isoformat(),
+            'after_id': last_app.id
         }
-        
-        return render_template('admin/applications.html',
-                             applications=applications_paginated,
-                             status_counts=status_counts,
-                             current_status=status_filter)
-    
-    except Exception as e:
-        current_app.logger.error(f"Error loading applications list: {str(e)}")
-        flash('Error loading applications.', 'error')
-        return render_template('admin/applications.html', 
-                             applications=[], 
-                             status_counts={}, 
-                             current_status='all')
+    
+    # Get counts for each status
+    counts = get_status_counts()
+    status_counts = {
+        'all': sum(counts.values()),
+        'pending': counts.get('PENDING', 0),
+        'approved': counts.get('APPROVED', 0),
+        'rejected': counts.get('REJECTED', 0)
+    }
+    
+    return render_template('admin/applications.html',
+                         applications=applications_page,
+                         has_next=has_next,
+                         next_cursor=next_cursor,
+                         status_counts=status_counts,
+                         current_status=status_filter)
 
 @admin_bp.route('/logout')
 def admin_logout():
@@ -186,53 +257,55 @@ def admin_logout():
 @admin_required
 def api_application_stats():
     """API endpoint for application statistics"""
-    try:
-        # Weekly application counts
-        from datetime import timedelta
-        one_week_ago = datetime.utcnow() - timedelta(days=7)
-        
-        weekly_stats = {
-            'total': Application.query.count(),
-            'last_week': Application.query.filter(Application.created_at >= one_week_ago).count(),
-            'approved': Application.query.filter_by(status='APPROVED').count(),
-            'pending': Application.query.filter_by(status='PENDING').count(),
-            'rejected': Application.query.filter_by(status='REJECTED').count()
-        }
-        
-        return jsonify(weekly_stats)
+    weekly_stats = get_application_stats()
     
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    # The counts are the whole payload, so they make a cheap ETag; polling
+    # clients get a bodiless 304 until a status change moves a count
+    etag = hashlib.md5(
+        ':'.join(f"{key}={value}" for key, value in sorted(weekly_stats.items())).encode()
+    ).hexdigest()
+    if request.if_none_match.contains(etag):
+        response = current_app.response_class(status=304)
+    else:
+        response = jsonify(weekly_stats)
+    response.set_etag(etag)
+    return response
 
 @admin_bp.route('/api/application/<app_id>/update_status', methods=['POST'])
 @admin_required
 def api_update_application_status(app_id):
     """API endpoint to update application status"""
-    try:
-        application = Application.query.filter_by(id=app_id).first_or_404()
-        data = request.get_json()
-        
-        new_status = data.get('status')
-        notes = data.get('notes', '')
-        
-        if new_status not in ['APPROVED', 'REJECTED', 'PENDING']:
-            return jsonify({'error': 'Invalid status'}), 400
-        
-        application.status = new_status
-        application.admin_review_notes = notes
-        application.reviewed_by_admin_id = session['admin_id']
-        application.reviewed_at = datetime.utcnow()
-        
-        db.session.commit()
-        
-        # Send notification
-        notification_service.send_decision_notification(
-            application, 
-            f"Application status updated to {new_status}. {notes}"
-        )
-        
-        return jsonify({'success': True, 'message': f'Status updated to {new_status}'})
+    data = request.get_json()
+    
+    new_status = data.get('status')
+    notes = data.get('notes', '')
+    
+    if new_status not in ['APPROVED', 'REJECTED', 'PENDING']:
+        return jsonify({'error': 'Invalid status'}), 400
     
-    except Exception as e:
+    # Single UPDATE statement, no SELECT or unit-of-work flush
+    result = db.session.execute(
+        update(Application)
+        .where(Application.id == app_id)
+        .values(
+            status=new_status,
+            admin_review_notes=notes,
+            reviewed_by_admin_id=g.admin_id,
+            reviewed_at=datetime.utcnow()
+        )
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 0:
         db.session.rollback()
-        return jsonify({'error': str(e)}), 500
\ No newline at end of file
+        return jsonify({'error': 'Application not found'}), 404
+    
+    # Send notification once the update is committed
+    notification_service.notify_after_commit(
+        app_id, 
+        f"Application status updated to {new_status}. {notes}"
+    )
+    
+    db.session.commit()
+    invalidate_stats_cache()
+    
+    return jsonify({'success': True, 'message': f'Status updated to {new_status}'})
\ No newline at end of file
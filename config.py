@@ -3,8 +3,30 @@ import os
 BASE_DIR = os.path.abspath(os.path.dirname(__file__))
 SQLALCHEMY_DATABASE_URI = f'sqlite:///{os.path.join(BASE_DIR, "casaflow.db")}'
 SQLALCHEMY_TRACK_MODIFICATIONS = False
+# Check pooled connections before use; SQLite file databases don't use a sized pool
+SQLALCHEMY_ENGINE_OPTIONS = {'pool_pre_ping': True}
+if not SQLALCHEMY_DATABASE_URI.startswith('sqlite'):
+    SQLALCHEMY_ENGINE_OPTIONS['pool_size'] = 10
 SECRET_KEY = 'a-very-secret-key-that-should-be-changed'
 UPLOAD_FOLDER = os.path.join(BASE_DIR, 'uploads')
+# --- Cache Configuration ---
+# Use Redis when REDIS_URL is set, otherwise an in-process cache for development
+REDIS_URL = os.environ.get('REDIS_URL')
+CACHE_TYPE = os.environ.get('CACHE_TYPE', 'RedisCache' if REDIS_URL else 'SimpleCache')
+CACHE_DEFAULT_TIMEOUT = 60
+# --- Notification Queue ---
+# Decision notifications go through an RQ queue on REDIS_URL; leave eager
+# (sent inline, no worker needed) unless NOTIFICATION_QUEUE_EAGER=false
+NOTIFICATION_QUEUE_EAGER = os.environ.get('NOTIFICATION_QUEUE_EAGER', 'true').lower() != 'false'
+NOTIFICATION_QUEUE_NAME = 'notifications'
+# --- Server-side Sessions ---
+# Set SESSION_TYPE (e.g. 'redis') to keep sessions in Flask-Session instead
+# of the signed cookie; unset keeps Flask's default cookie sessions
+SESSION_TYPE = os.environ.get('SESSION_TYPE')
+# --- Instant Decisioning ---
+# Run the independent verification steps on a thread pool; only worth it
+# when a verification backend does real network or database I/O
+PARALLEL_VERIFICATIONS = os.environ.get('PARALLEL_VERIFICATIONS', 'false').lower() == 'true'
 # --- Email Configuration (Placeholder) ---
 SMTP_SERVER = 'smtp.example.com'
 SMTP_PORT = 587
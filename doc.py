@@ -1,6 +1,12 @@
+import io
 import os
+import operator
 import random
+import sys
+from functools import cache
+from itertools import accumulate
 from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor
 from faker import Faker
 from fpdf import FPDF, XPos, YPos
 import qrcode
@@ -38,9 +44,17 @@ class PDF(FPDF):
         self.set_font('Helvetica', 'I', 8)
         self.cell(0, 10, f'Page {self.page_no()}', align='C')
 
+def save_pdf(pdf, name):
+    """Write a finished document into OUTPUT_DIR."""
+    filename = os.path.join(OUTPUT_DIR, name)
+    pdf.output(filename)
+    print(f"✅ Created: {filename}")
+
 # ---------------------- SALARY SLIP ----------------------
-def create_salary_slip(profile, date):
-    pdf = PDF()
+def create_salary_slip(profile, date, pdf=None):
+    standalone = pdf is None
+    if standalone:
+        pdf = PDF()
     pdf.add_page()
     pdf.set_font('Helvetica', 'B', 16)
     pdf.cell(0, 10, profile["company"], align='C', new_x=XPos.LMARGIN, new_y=YPos.NEXT)
@@ -86,13 +100,22 @@ def create_salary_slip(profile, date):
     pdf.set_font('Helvetica', 'B', 12)
     pdf.cell(0, 10, f'Net Salary Paid: INR {profile["net_monthly_salary"]:,.2f}', align='R', new_x=XPos.LMARGIN, new_y=YPos.NEXT)
 
-    filename = os.path.join(OUTPUT_DIR, f"salary_slip_{date.strftime('%b_%Y')}.pdf")
-    pdf.output(filename)
-    print(f"✅ Created: {filename}")
+    if standalone:
+        save_pdf(pdf, f"salary_slip_{date.strftime('%b_%Y')}.pdf")
 
 # ---------------------- BANK STATEMENT ----------------------
-def create_bank_statement(profile, months=6):
-    pdf = PDF()
+BANK_STATEMENT_HEADERS = ("Date", "Description", "Debit", "Credit", "Balance")
+DEBIT_DESCRIPTION_POOL_SIZE = 256
+
+@cache
+def _debit_descriptions():
+    """Uppercased Faker phrases for debit rows, generated once per process."""
+    return tuple(fake.bs().upper() for _ in range(DEBIT_DESCRIPTION_POOL_SIZE))
+
+def create_bank_statement(profile, months=6, pdf=None):
+    standalone = pdf is None
+    if standalone:
+        pdf = PDF()
     pdf.add_page()
     pdf.set_font('Helvetica', 'B', 16)
     pdf.cell(0, 10, profile["bank"], align='C', new_x=XPos.LMARGIN, new_y=YPos.NEXT)
@@ -117,55 +140,53 @@ def create_bank_statement(profile, months=6):
     pdf.ln(5)
 
     opening_balance = random.uniform(70000, 200000)
+    salary = profile["net_monthly_salary"]
+    salary_label = f"SALARY CREDIT - {profile['company']}"
+    salary_cell = f"{salary:,.2f}"
+    descriptions = _debit_descriptions()
 
+    # Anchor every month to one clock read
+    now = datetime.now()
     for i in range(months, 0, -1):
-        current_date = datetime.now() - timedelta(days=i * 30)
+        current_date = now - timedelta(days=i * 30)
+
+        # Build the whole month's rows first, then lay them out as one table
+        rows = [BANK_STATEMENT_HEADERS]
+        rows.append((current_date.replace(day=1).strftime('%d-%m-%Y'), "Opening Balance", "", "", f"{opening_balance:,.2f}"))
+
+        salary_credit_date = current_date.replace(day=random.randint(1, 5))
+        balance = opening_balance + salary
+        rows.append((salary_credit_date.strftime('%d-%m-%Y'), salary_label, "", salary_cell, f"{balance:,.2f}"))
+
+        # Draw the month's debits up front and run the balance in one pass
+        debit_count = random.randint(6, 12)
+        debits = [random.uniform(500, 8000) for _ in range(debit_count)]
+        day_offsets = [random.randint(2, 28) for _ in range(debit_count)]
+        balances = list(accumulate(debits, operator.sub, initial=balance))[1:]
+        rows.extend(
+            ((salary_credit_date + timedelta(days=offset)).strftime('%d-%m-%Y'), random.choice(descriptions),
+             f"{debit_amount:,.2f}", "", f"{running_balance:,.2f}")
+            for debit_amount, offset, running_balance in zip(debits, day_offsets, balances)
+        )
+
+        opening_balance = balances[-1]
+
         pdf.set_font('Helvetica', 'B', 12)
         pdf.cell(0, 10, f"Transactions for {current_date.strftime('%B %Y')}", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+        with pdf.table(rows, width=190, text_align="LEFT"):
+            pass
 
-        headers = ["Date", "Description", "Debit", "Credit", "Balance"]
-        with pdf.table(width=190, text_align="LEFT") as table:
-            header_row = table.row()
-            for h in headers:
-                header_row.cell(h)
-
-            data_row = table.row()
-            data_row.cell(current_date.replace(day=1).strftime('%d-%m-%Y'))
-            data_row.cell("Opening Balance")
-            data_row.cell("")
-            data_row.cell("")
-            data_row.cell(f"{opening_balance:,.2f}")
-
-            salary_credit_date = current_date.replace(day=random.randint(1, 5))
-            balance = opening_balance + profile["net_monthly_salary"]
-            data_row = table.row()
-            data_row.cell(salary_credit_date.strftime('%d-%m-%Y'))
-            data_row.cell(f"SALARY CREDIT - {profile['company']}")
-            data_row.cell("")
-            data_row.cell(f"{profile['net_monthly_salary']:,.2f}")
-            data_row.cell(f"{balance:,.2f}")
-
-            for _ in range(random.randint(6, 12)):
-                debit_amount = random.uniform(500, 8000)
-                balance -= debit_amount
-                debit_date = salary_credit_date + timedelta(days=random.randint(2, 28))
-                data_row = table.row()
-                data_row.cell(debit_date.strftime('%d-%m-%Y'))
-                data_row.cell(fake.bs().upper())
-                data_row.cell(f"{debit_amount:,.2f}")
-                data_row.cell("")
-                data_row.cell(f"{balance:,.2f}")
-
-            opening_balance = balance
-
-    filename = os.path.join(OUTPUT_DIR, "bank_statement_last_6_months.pdf")
-    pdf.output(filename)
-    print(f"✅ Created: {filename}")
+    if standalone:
+        save_pdf(pdf, "bank_statement_last_6_months.pdf")
 
 # ---------------------- KYC DOCUMENT ----------------------
-def create_kyc_document(profile):
-    pdf = FPDF(orientation='L', unit='mm', format=[148, 105])
-    pdf.add_page()
+KYC_CARD_FORMAT = (148, 105)
+
+def create_kyc_document(profile, pdf=None):
+    standalone = pdf is None
+    if standalone:
+        pdf = FPDF(orientation='L', unit='mm', format=KYC_CARD_FORMAT)
+    pdf.add_page(orientation='L', format=KYC_CARD_FORMAT)
     pdf.set_line_width(0.5)
     pdf.rect(5, 5, pdf.w - 10, pdf.h - 10)
 
@@ -174,11 +195,17 @@ def create_kyc_document(profile):
     pdf.ln(5)
 
     qr_data = f"Aadhar No: {profile['aadhar']}\nName: {profile['name']}\nPAN: {profile['pan']}"
-    qr_img = qrcode.make(qr_data)
-    qr_path = os.path.join(OUTPUT_DIR, "temp_qr.png")
-    qr_img.save(qr_path)
-    pdf.image(qr_path, x=10, y=25, w=30)
-    os.remove(qr_path)
+    # The code is scaled down to 30mm, so a small image with low error
+    # correction is enough; fit=True picks the smallest version that holds it
+    qr = qrcode.QRCode(error_correction=qrcode.constants.ERROR_CORRECT_L, box_size=4, border=2)
+    qr.add_data(qr_data)
+    qr.make(fit=True)
+    qr_img = qr.make_image()
+    # Hand the PNG to fpdf from memory rather than via a temp file
+    qr_png = io.BytesIO()
+    qr_img.save(qr_png)
+    qr_png.seek(0)
+    pdf.image(qr_png, x=10, y=25, w=30)
 
     pdf.set_xy(45, 30)
     pdf.set_font('Helvetica', '', 10)
@@ -190,13 +217,14 @@ def create_kyc_document(profile):
     pdf.set_font('Helvetica', 'B', 14)
     pdf.cell(0, 10, f"Aadhar: {profile['aadhar']}", align='C', new_x=XPos.LMARGIN, new_y=YPos.NEXT)
 
-    filename = os.path.join(OUTPUT_DIR, "kyc_document.pdf")
-    pdf.output(filename)
-    print(f"✅ Created: {filename}")
+    if standalone:
+        save_pdf(pdf, "kyc_document.pdf")
 
 # ---------------------- PROPERTY VALUATION ----------------------
-def create_property_valuation_report(profile):
-    pdf = PDF()
+def create_property_valuation_report(profile, pdf=None):
+    standalone = pdf is None
+    if standalone:
+        pdf = PDF()
     pdf.add_page()
     pdf.set_font('Helvetica', 'B', 16)
     pdf.cell(0, 10, 'Property Valuation Report', align='C', new_x=XPos.LMARGIN, new_y=YPos.NEXT)
@@ -222,13 +250,14 @@ def create_property_valuation_report(profile):
     pdf.set_font('Helvetica', '', 11)
     pdf.cell(0, 7, "Sincerely, Certified Valuer", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
 
-    filename = os.path.join(OUTPUT_DIR, "property_valuation_report.pdf")
-    pdf.output(filename)
-    print(f"✅ Created: {filename}")
+    if standalone:
+        save_pdf(pdf, "property_valuation_report.pdf")
 
 # ---------------------- LEGAL CLEARANCE ----------------------
-def create_legal_clearance_document(profile):
-    pdf = PDF()
+def create_legal_clearance_document(profile, pdf=None):
+    standalone = pdf is None
+    if standalone:
+        pdf = PDF()
     pdf.add_page()
     pdf.set_font('Helvetica', 'B', 16)
     pdf.cell(0, 10, 'Legal Opinion Report', align='C', new_x=XPos.LMARGIN, new_y=YPos.NEXT)
@@ -246,21 +275,23 @@ def create_legal_clearance_document(profile):
     )
     pdf.multi_cell(0, 7, text, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
 
-    filename = os.path.join(OUTPUT_DIR, "legal_clearance_document.pdf")
-    pdf.output(filename)
-    print(f"✅ Created: {filename}")
+    if standalone:
+        save_pdf(pdf, "legal_clearance_document.pdf")
 
 # ---------------------- NA PERMISSION DOCUMENT ----------------------
-def create_na_permission_document(profile):
-    pdf = PDF()
+def create_na_permission_document(profile, pdf=None):
+    standalone = pdf is None
+    if standalone:
+        pdf = PDF()
     pdf.add_page()
     pdf.set_font('Helvetica', 'B', 16)
     pdf.cell(0, 10, 'NON-AGRICULTURAL (NA) PERMISSION CERTIFICATE', align='C', new_x=XPos.LMARGIN, new_y=YPos.NEXT)
     pdf.ln(10)
 
     pdf.set_font('Helvetica', '', 11)
-    pdf.cell(0, 7, f"Date: {datetime.now().strftime('%d %B, %Y')}", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
-    pdf.cell(0, 7, f"Ref No: NA/{random.randint(1000,9999)}/{datetime.now().year}", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+    today = datetime.now()
+    pdf.cell(0, 7, f"Date: {today.strftime('%d %B, %Y')}", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+    pdf.cell(0, 7, f"Ref No: NA/{random.randint(1000,9999)}/{today.year}", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
     pdf.ln(10)
 
     pdf.set_font('Helvetica', 'BU', 12)
@@ -283,26 +314,61 @@ def create_na_permission_document(profile):
     pdf.cell(0, 7, "Department of Urban Development", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
     pdf.cell(0, 7, "Government of Haryana", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
 
-    filename = os.path.join(OUTPUT_DIR, "na_permission_certificate.pdf")
-    pdf.output(filename)
-    print(f"✅ Created: {filename}")
+    if standalone:
+        save_pdf(pdf, "na_permission_certificate.pdf")
+
+# ---------------------- SINGLE-FILE BUNDLE ----------------------
+def build_bundle(profile):
+    """Writes every document as a section of one PDF, sharing fonts and metadata."""
+    pdf = PDF()
+    now = datetime.now()
+    for i in range(3, 0, -1):
+        create_salary_slip(profile, now - timedelta(days=i * 30), pdf=pdf)
+    create_bank_statement(profile, months=6, pdf=pdf)
+    create_kyc_document(profile, pdf=pdf)
+    create_property_valuation_report(profile, pdf=pdf)
+    create_legal_clearance_document(profile, pdf=pdf)
+    create_na_permission_document(profile, pdf=pdf)
+    save_pdf(pdf, "loan_document_bundle.pdf")
+
+# ---------------------- PARALLEL GENERATION ----------------------
+def _init_worker():
+    """Reseed in each worker so forked processes don't share random sequences."""
+    random.seed()
+    fake.seed_instance(random.getrandbits(64))
+
+def _invoke(task):
+    func, args = task
+    return func(*args)
 
 # ---------------------- MAIN SCRIPT ----------------------
 if __name__ == "__main__":
-    if not os.path.exists(OUTPUT_DIR):
-        os.makedirs(OUTPUT_DIR)
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
 
     print(f"--- Starting Document Generation for {profile['name']} ---")
 
-    for i in range(3, 0, -1):
-        slip_date = datetime.now() - timedelta(days=i * 30)
-        create_salary_slip(profile, slip_date)
-
-    create_bank_statement(profile, months=6)
-    create_kyc_document(profile)
-    create_property_valuation_report(profile)
-    create_legal_clearance_document(profile)
-    create_na_permission_document(profile)
+    # The application uploads each document separately; --bundle writes
+    # them all into a single PDF instead
+    if "--bundle" in sys.argv:
+        build_bundle(profile)
+        sys.exit()
+
+    now = datetime.now()
+    tasks = [
+        (create_salary_slip, (profile, now - timedelta(days=i * 30)))
+        for i in range(3, 0, -1)
+    ]
+    tasks += [
+        (create_bank_statement, (profile, 6)),
+        (create_kyc_document, (profile,)),
+        (create_property_valuation_report, (profile,)),
+        (create_legal_clearance_document, (profile,)),
+        (create_na_permission_document, (profile,)),
+    ]
+
+    # Each document is written to its own file, so they can be laid out in parallel
+    with ProcessPoolExecutor(initializer=_init_worker) as executor:
+        list(executor.map(_invoke, tasks))
 
     print("\n--- Document Generation Complete ---")
     print(f"All files are saved in: {OUTPUT_DIR}")
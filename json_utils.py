@@ -0,0 +1,52 @@
+# json_utils.py
+import json
+from flask.json.provider import DefaultJSONProvider
+
+# Try to import orjson with fallback to the stdlib json module
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+def dumps(obj):
+    """Serialize obj to a JSON string"""
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY).decode()
+        except TypeError:
+            # Types orjson rejects (e.g. Decimal) keep the stdlib behaviour
+            pass
+    return json.dumps(obj)
+
+def loads(s):
+    """Parse a JSON string or bytes"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(s)
+    return json.loads(s)
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider that serializes jsonify responses with orjson"""
+    
+    def dumps(self, obj, **kwargs):
+        if 'cls' in kwargs:
+            return super().dumps(obj, **kwargs)
+        
+        # Datetimes go through self.default so they keep Flask's HTTP date format
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_PASSTHROUGH_DATETIME
+        if kwargs.get('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        
+        try:
+            return orjson.dumps(obj, default=kwargs.get('default', self.default), option=option).decode()
+        except TypeError:
+            return super().dumps(obj, **kwargs)
+    
+    def loads(self, s, **kwargs):
+        # orjson has no object_hook, which the session serializer relies on
+        # to untag tuples, bytes, datetimes and Markup
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
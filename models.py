@@ -1,10 +1,18 @@
 # models.py
 
 from flask_sqlalchemy import SQLAlchemy
+from flask_caching import Cache
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
+from functools import cached_property
+from sqlalchemy.dialects import postgresql
 
 db = SQLAlchemy()
+cache = Cache()
+
+# Verification reports are stored as native JSON (JSONB on PostgreSQL) so
+# the ORM hands back dicts instead of strings that need json.loads
+JSONReport = db.JSON(none_as_null=True).with_variant(postgresql.JSONB(none_as_null=True), 'postgresql')
 
 class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -15,6 +23,12 @@ class User(db.Model):
     applications = db.relationship('Application', backref='user', lazy=True, cascade='all, delete-orphan')
 
 class Application(db.Model):
+    # Back the admin listings: filter by status, newest first
+    __table_args__ = (
+        db.Index('ix_app_status_created', 'status', db.desc('created_at')),
+        db.Index('ix_app_created', db.desc('created_at')),
+    )
+    
     id = db.Column(db.String(20), primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     
@@ -52,44 +66,80 @@ class Application(db.Model):
     kyc_status = db.Column(db.String(20), default='PENDING')
     
     # Reports
-    banking_analysis_report = db.Column(db.Text)
-    fraud_detection_report = db.Column(db.Text)
+    banking_analysis_report = db.Column(JSONReport)
+    fraud_detection_report = db.Column(JSONReport)
     
     # Loan Terms (if approved)
     interest_rate = db.Column(db.Float)
     loan_term_years = db.Column(db.Integer)
     emi_amount = db.Column(db.Float)
-    ai_analysis_report = db.Column(db.Text)
+    ai_analysis_report = db.Column(JSONReport)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-    na_document_verification = db.Column(db.Text)  # Store NA verification report as JSON
+    na_document_verification = db.Column(JSONReport)  # Store NA verification report as JSON
     na_document_status = db.Column(db.String(20), default='PENDING')
     na_document_risk_score = db.Column(db.Float, default=0.0)
     # Relationships
     documents = db.relationship('Document', backref='application', lazy=True, cascade='all, delete-orphan')
     emis = db.relationship('EMI', backref='application', lazy=True, cascade='all, delete-orphan')
+    na_verification_steps = db.relationship('NaVerificationStep', lazy=True, cascade='all, delete-orphan',
+                                            order_by='NaVerificationStep.position')
     # models.py - Add these fields to your Application model
 
 
     employment_verification_status = db.Column(db.String(50), default='PENDING')
-    employment_verification_report = db.Column(db.Text)  # Store detailed employment verification
+    employment_verification_report = db.Column(JSONReport)  # Store detailed employment verification
     document_verification_status = db.Column(db.String(50), default='PENDING')
-    document_verification_report = db.Column(db.Text)    # Store document verification details
-    na_document_verification = db.Column(db.Text)        # Non-agricultural document verification
+    document_verification_report = db.Column(JSONReport)  # Store document verification details
+    na_document_verification = db.Column(JSONReport)      # NA verification summary (steps are in na_verification_step)
     overall_risk_score = db.Column(db.Float)             # Overall risk score 0-100
-    verification_summary = db.Column(db.Text)            # Final verification summary
+    verification_summary = db.Column(JSONReport)          # Final verification summary
     
     # EMI and loan details
     emi_plan_generated = db.Column(db.Boolean, default=False)
     loan_disbursement_date = db.Column(db.DateTime)
     first_emi_date = db.Column(db.DateTime)
+    
+    # Admin review details
+    admin_review_notes = db.Column(db.Text)
+    reviewed_by_admin_id = db.Column(db.Integer, db.ForeignKey('admin.id'))
+    reviewed_at = db.Column(db.DateTime)
+    reviewed_by_admin = db.relationship('Admin', lazy=True)
+    
+    def na_verification_report(self):
+        """NA verification summary with its steps loaded from na_verification_step"""
+        report = dict(self.na_document_verification or {})
+        # Reports saved before the steps table keep their embedded steps
+        if self.na_verification_steps:
+            report['verification_steps'] = [step.to_dict() for step in self.na_verification_steps]
+        return report
 class Document(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     application_id = db.Column(db.String(20), db.ForeignKey('application.id'), nullable=False)
     document_type = db.Column(db.String(50), nullable=False)
     file_path = db.Column(db.String(500), nullable=False)
     original_filename = db.Column(db.String(255), nullable=False)
+    file_size = db.Column(db.Integer)  # Bytes, recorded at upload
     uploaded_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    @cached_property
+    def document_type_lc(self):
+        """Lowercased document type, computed once per instance"""
+        return (self.document_type or '').lower()
+
+class NaVerificationStep(db.Model):
+    """One step of an application's NA document verification, loaded only when displayed"""
+    __tablename__ = 'na_verification_step'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    application_id = db.Column(db.String(20), db.ForeignKey('application.id'), nullable=False, index=True)
+    position = db.Column(db.Integer, nullable=False)
+    step = db.Column(db.String(100), nullable=False)
+    status = db.Column(db.String(30), nullable=False)
+    details = db.Column(db.Text)
+    
+    def to_dict(self):
+        return {'step': self.step, 'status': self.status, 'details': self.details}
 
 class Admin(db.Model):
     id = db.Column(db.Integer, primary_key=True)
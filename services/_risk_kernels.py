@@ -0,0 +1,96 @@
+# services/_risk_kernels.py
+"""Numeric kernels behind the instant decision risk scoring.
+
+The kernels take plain floats so they can be JIT-compiled with Numba when
+it is installed; otherwise they run as ordinary Python functions.
+"""
+
+# Try to import Numba with fallback to plain Python
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit"""
+        def decorator(func):
+            return func
+        return decorator
+
+@njit('i8(f8, f8, f8, f8, f8)', cache=True)
+def financial_risk_score(existing_emi, monthly_salary, loan_amount, property_valuation, cibil_score):
+    """Financial risk points (0-100) from DTI, LTV and CIBIL bands"""
+    risk_score = 0
+    
+    # Debt-to-income ratio
+    dti = (existing_emi / monthly_salary) * 100 if monthly_salary > 0 else 100.0
+    if dti > 50:
+        risk_score += 40
+    elif dti > 30:
+        risk_score += 20
+    else:
+        risk_score += 10
+    
+    # Loan-to-value ratio
+    ltv = (loan_amount / property_valuation) * 100 if property_valuation > 0 else 100.0
+    if ltv > 80:
+        risk_score += 30
+    elif ltv > 60:
+        risk_score += 15
+    else:
+        risk_score += 5
+    
+    # CIBIL score impact
+    if cibil_score < 600:
+        risk_score += 30
+    elif cibil_score < 750:
+        risk_score += 15
+    else:
+        risk_score += 5
+    
+    return min(100, risk_score)
+
+@njit('UniTuple(f8, 4)(f8, f8, f8, f8, f8)', cache=True)
+def ai_risk_factors(existing_emi, monthly_salary, loan_amount, property_valuation, cibil_score):
+    """Average ML risk plus the DTI, LTV and salary adequacy features it uses"""
+    dti = (existing_emi / monthly_salary) * 100 if monthly_salary > 0 else 100.0
+    ltv = (loan_amount / property_valuation) * 100 if property_valuation > 0 else 100.0
+    salary_adequacy = monthly_salary / (loan_amount / 100000)  # Salary per lakh loan
+    
+    # CIBIL score impact
+    if cibil_score >= 800:
+        credit_risk = 0.1  # Excellent credit
+    elif cibil_score >= 750:
+        credit_risk = 0.3  # Good credit
+    elif cibil_score >= 700:
+        credit_risk = 0.5  # Fair credit
+    else:
+        credit_risk = 0.8  # Poor credit
+    
+    # Debt-to-Income ratio
+    if dti <= 30:
+        dti_risk = 0.2
+    elif dti <= 50:
+        dti_risk = 0.4
+    else:
+        dti_risk = 0.8
+    
+    # Loan-to-Value ratio
+    if ltv <= 60:
+        ltv_risk = 0.1
+    elif ltv <= 80:
+        ltv_risk = 0.3
+    else:
+        ltv_risk = 0.7
+    
+    # Salary adequacy
+    if salary_adequacy >= 5000:  # 5000 per lakh loan
+        salary_risk = 0.2
+    elif salary_adequacy >= 3000:
+        salary_risk = 0.4
+    else:
+        salary_risk = 0.8
+    
+    avg_risk = (credit_risk + dti_risk + ltv_risk + salary_risk) / 4 * 100
+    return avg_risk, dti, ltv, salary_adequacy
@@ -17,7 +17,7 @@ class ApplicationProcessor:
         Process application with enhanced credit risk assessment and AI analysis
         """
         try:
-            application = Application.query.get(application_id)
+            application = db.session.get(Application, application_id)
             if not application:
                 return {'success': False, 'error': 'Application not found'}
             
@@ -1,11 +1,19 @@
 # services/autofill_service.py - Enhanced version
 
+import io
 import re
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Iterable
 
 logger = logging.getLogger(__name__)
 
+# Compiled once rather than looked up in re's cache on every line
+NON_ALNUM_RE = re.compile(r'[^a-zA-Z0-9\s]')
+NON_NUMERIC_RE = re.compile(r'[^\d.]')
+
+SECTION_HEADERS = ('applicant details', 'financial', 'property', 'loan details')
+SEPARATORS = (':', '-', '|', '=')
+
 class AutoFillService:
     def __init__(self):
         self.field_mappings = {
@@ -31,23 +39,35 @@ class AutoFillService:
     
     def parse_text_data(self, content: str) -> Dict[str, Any]:
         """Parse text content and extract structured data"""
+        return self.parse_text_lines(content.split('\n'))
+    
+    def parse_text_stream(self, stream, encoding: str = 'utf-8') -> Dict[str, Any]:
+        """Parse a binary upload stream line by line without reading it whole"""
+        text_stream = io.TextIOWrapper(stream, encoding=encoding)
+        try:
+            return self.parse_text_lines(text_stream)
+        finally:
+            # Leave the underlying stream open for its owner
+            text_stream.detach()
+    
+    def parse_text_lines(self, lines: Iterable[str]) -> Dict[str, Any]:
+        """Extract structured data from an iterable of text lines"""
         data = {}
-        lines = content.split('\n')
         
         for line in lines:
             if not line.strip():
                 continue
                 
             # Skip section headers
-            if any(header in line.lower() for header in ['applicant details', 'financial', 'property', 'loan details']):
+            line_lower = line.lower()
+            if any(header in line_lower for header in SECTION_HEADERS):
                 continue
                 
             # Try different separators: colon, dash, pipe, equals
-            separators = [':', '-', '|', '=']
             found_separator = None
             separator_index = -1
             
-            for sep in separators:
+            for sep in SEPARATORS:
                 idx = line.find(sep)
                 if idx != -1:
                     found_separator = sep
@@ -71,7 +91,7 @@ class AutoFillService:
     def _map_field_name(self, key: str) -> str:
         """Map various key formats to standard field names"""
         # Remove common prefixes/suffixes and clean the key
-        key = re.sub(r'[^a-zA-Z0-9\s]', '', key).strip()
+        key = NON_ALNUM_RE.sub('', key).strip()
         
         for field_name, variations in self.field_mappings.items():
             for variation in variations:
@@ -115,5 +135,5 @@ class AutoFillService:
     def _extract_number(self, text: str) -> float:
         """Extract numeric value from text"""
         # Remove currency symbols, commas, and other non-numeric characters except decimal point
-        cleaned = re.sub(r'[^\d.]', '', text)
+        cleaned = NON_NUMERIC_RE.sub('', text)
         return float(cleaned) if cleaned else 0.0
\ No newline at end of file
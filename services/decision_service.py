@@ -1,11 +1,9 @@
 # services/decision_service.py
 
-import json
-
 class DecisionService:
     def make_decision(self, application):
-        banking_report = json.loads(application.banking_analysis_report or '{}')
-        fraud_report = json.loads(application.fraud_detection_report or '{}')
+        banking_report = application.banking_analysis_report or {}
+        fraud_report = application.fraud_detection_report or {}
         
         if application.employment_status != 'VERIFIED':
             return 'REJECTED', "Employment could not be verified.", None
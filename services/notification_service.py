@@ -1,6 +1,87 @@
 # services/notification_service.py
 
+from flask import current_app, has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from models import db, Application
+
+# session.info key for notifications waiting on the current transaction
+PENDING_NOTIFICATIONS_KEY = 'pending_decision_notifications'
+
+def send_decision_notification_job(application_id, reason):
+    """Queue job: re-load the application by id and send its notification"""
+    if has_app_context():
+        return _send_for_application_id(application_id, reason)
+    
+    # Running inside an RQ worker, outside of any Flask request
+    from app import app
+    with app.app_context():
+        return _send_for_application_id(application_id, reason)
+
+def _send_for_application_id(application_id, reason, session=None):
+    application = (session or db.session).get(Application, application_id)
+    if application is None:
+        current_app.logger.warning(f"Notification skipped: application {application_id} not found")
+        return False
+    return NotificationService().send_decision_notification(application, reason)
+
 class NotificationService:
+    def __init__(self):
+        self.queue = None
+        self._listening = False
+    
+    def init_app(self, app):
+        """Set up the RQ queue unless notifications are sent eagerly"""
+        self._listen_for_commits()
+        
+        if app.config.get('NOTIFICATION_QUEUE_EAGER', True):
+            self.queue = None
+            return
+        
+        from redis import Redis
+        from rq import Queue
+        self.queue = Queue(
+            app.config.get('NOTIFICATION_QUEUE_NAME', 'notifications'),
+            connection=Redis.from_url(app.config['REDIS_URL'])
+        )
+    
+    def _listen_for_commits(self):
+        """Hook pending notifications to db.session commit/rollback"""
+        if self._listening:
+            return
+        event.listen(db.session, 'after_commit', self._dispatch_pending)
+        event.listen(db.session, 'after_soft_rollback', self._discard_pending)
+        self._listening = True
+    
+    def notify_after_commit(self, application_id, reason):
+        """Send the decision notification once the current transaction commits"""
+        db.session.info.setdefault(PENDING_NOTIFICATIONS_KEY, []).append((application_id, reason))
+    
+    def _dispatch_pending(self, session):
+        pending = session.info.pop(PENDING_NOTIFICATIONS_KEY, None)
+        if not pending:
+            return
+        
+        # The transaction is already committed, so a failed send must not
+        # surface as an error from commit()
+        try:
+            if self.queue is not None:
+                for application_id, reason in pending:
+                    self.queue.enqueue(send_decision_notification_job, application_id, reason)
+                return
+            
+            # A session cannot emit SQL inside its own after_commit hook,
+            # so eager sends load the applications through a fresh one
+            with Session(db.engine) as fresh_session:
+                for application_id, reason in pending:
+                    _send_for_application_id(application_id, reason, fresh_session)
+        except Exception as e:
+            current_app.logger.exception(f"Error sending decision notifications: {str(e)}")
+    
+    def _discard_pending(self, session, previous_transaction):
+        if not previous_transaction.nested:
+            session.info.pop(PENDING_NOTIFICATIONS_KEY, None)
+    
     def send_decision_notification(self, application, reason):
         """Send notification about application decision"""
         # In production, integrate with email/SMS services
@@ -33,7 +33,8 @@ class StorageService:
                     application_id=app_id,
                     document_type=doc_type,
                     file_path=file_path,
-                    original_filename=file.filename
+                    original_filename=file.filename,
+                    file_size=os.path.getsize(file_path)
                 )
                 saved_docs.append(doc)
         
@@ -0,0 +1,29 @@
+# tests/support.py
+"""Point the app at a throwaway copy of casaflow.db before importing it"""
+import atexit
+import os
+import shutil
+import tempfile
+
+import config
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = tempfile.mkdtemp(prefix='casaflow-test-')
+atexit.register(shutil.rmtree, DATA_DIR, ignore_errors=True)
+
+shutil.copyfile(os.path.join(ROOT, 'casaflow.db'), os.path.join(DATA_DIR, 'casaflow.db'))
+config.SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(DATA_DIR, 'casaflow.db')}"
+config.UPLOAD_FOLDER = os.path.join(DATA_DIR, 'uploads')
+
+from app import app, db  # noqa: E402
+from models import User  # noqa: E402
+
+app.config['TESTING'] = True
+
+def create_user(mobile_number):
+    """Add a user to the test database and return its id"""
+    with app.app_context():
+        user = User(mobile_number=mobile_number)
+        db.session.add(user)
+        db.session.commit()
+        return user.id
@@ -0,0 +1,101 @@
+# tests/test_apply.py
+import io
+import itertools
+import os
+import unittest
+
+from tests.support import DATA_DIR, app, create_user, db
+from app import initialize_na_verification
+from models import Application
+
+APPLICATION_FORM = {
+    'first_name': 'Rahul',
+    'last_name': 'Sharma',
+    'email': 'rahul@example.com',
+    'gender': 'Male',
+    'current_address': 'Flat 1101, Pinnacle Towers, Gurugram',
+    'aadhar_number': '987654321098',
+    'pan_number': 'FGHIJ5678K',
+    'monthly_salary': '115000',
+    'company_name': 'NextGen Analytics',
+    'existing_emi': '0',
+    'cibil_score': '780',
+    'loan_amount': '2500000',
+    'property_valuation': '11000000',
+    'property_address': 'Plot 42, Sector 57, Gurugram',
+    'is_non_agricultural': 'True',
+}
+DOCUMENT_FIELDS = ('bank_statements', 'salary_slips', 'kyc_docs', 'na_document')
+MOBILE_NUMBERS = (f'90000{n:05d}' for n in itertools.count(1))
+
+class ApplyTest(unittest.TestCase):
+    def setUp(self):
+        # Uploads are saved relative to the working directory
+        self.cwd = os.getcwd()
+        os.chdir(DATA_DIR)
+        self.user_id = create_user(next(MOBILE_NUMBERS))
+        self.client = app.test_client()
+        with self.client.session_transaction() as session:
+            session['user_id'] = self.user_id
+    
+    def tearDown(self):
+        os.chdir(self.cwd)
+    
+    def submit_application(self):
+        data = dict(APPLICATION_FORM)
+        for field in DOCUMENT_FIELDS:
+            data[field] = (io.BytesIO(b'%PDF-1.4 test'), f'{field}.pdf')
+        return self.client.post('/apply', data=data, content_type='multipart/form-data')
+    
+    def assert_decided(self):
+        with app.app_context():
+            application = Application.query.filter_by(user_id=self.user_id).one()
+            self.assertNotEqual(application.status, 'PENDING')
+            self.assertTrue(application.employment_verification_report)
+            self.assertTrue(application.document_verification_report)
+            return application.id
+    
+    def test_apply_then_view_result(self):
+        response = self.submit_application()
+        self.assertEqual(response.status_code, 302)
+        app_id = self.assert_decided()
+        
+        # The result page shows the decision flashed by /apply
+        response = self.client.get(response.headers['Location'])
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(f'Application #{app_id} processed instantly!'.encode(), response.data)
+
+    def test_na_verification_steps_are_shown(self):
+        self.submit_application()
+        app_id = self.assert_decided()
+        
+        with app.app_context():
+            application = db.session.get(Application, app_id)
+            self.assertNotIn('verification_steps', application.na_document_verification)
+            steps = application.na_verification_report()['verification_steps']
+            # Storing the steps as rows leaves the returned report intact
+            self.assertEqual(initialize_na_verification(app_id)['verification_steps'], steps)
+        self.assertTrue(steps)
+        
+        response = self.client.get(f'/verification_report/{app_id}')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(steps[0]['step'].encode(), response.data)
+        
+        admin_client = app.test_client()
+        with admin_client.session_transaction() as session:
+            session['admin_id'] = 1
+        response = admin_client.get(f'/admin/application/{app_id}/review')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(steps[0]['step'].encode(), response.data)
+
+class ParallelApplyTest(ApplyTest):
+    def setUp(self):
+        super().setUp()
+        app.config['PARALLEL_VERIFICATIONS'] = True
+    
+    def tearDown(self):
+        app.config['PARALLEL_VERIFICATIONS'] = False
+        super().tearDown()
+
+if __name__ == '__main__':
+    unittest.main()
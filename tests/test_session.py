@@ -0,0 +1,23 @@
+# tests/test_session.py
+import unittest
+
+from tests.support import app
+
+class SessionSerializationTest(unittest.TestCase):
+    def test_tagged_values_survive_the_session_cookie(self):
+        serializer = app.session_interface.get_signing_serializer(app)
+        data = {'_flashes': [('success', 'hi')], 'raw': b'bytes'}
+        # The serializer goes through app.json inside an app context
+        with app.app_context():
+            self.assertEqual(serializer.loads(serializer.dumps(data)), data)
+    
+    def test_flash_renders_after_redirect(self):
+        client = app.test_client()
+        # Anonymous access flashes a message and redirects to the login page
+        response = client.get('/apply', follow_redirects=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'Please log in to access this page.', response.data)
+        self.assertIn(b'alert-error', response.data)
+
+if __name__ == '__main__':
+    unittest.main()